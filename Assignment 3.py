@@ -1,26 +1,29 @@
 import os.path
-import requests
-from flask import Flask, request, jsonify, render_template, url_for, redirect
+from flask import Flask, request, render_template
 import csv
+import sqlite3
 import threading
-import queue
 import logging
-import json
+import orjson
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 app = Flask(__name__)
 
-with open('config.json', 'r') as config_file:
-    config = json.load(config_file)
+with open('config.json', 'rb') as config_file:
+    config = orjson.loads(config_file.read())
 
 log_path = config['logging']['path']
-thread_size = config['threading']['size']
-queue_size = config['queue']['size']
 csv_file = config['csv']['file_path']
+db_file = config['sqlite']['file_path']
 
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
+logger.setLevel(logging.INFO)
 file_handler = logging.FileHandler(log_path)
-file_handler.setLevel(logging.DEBUG)
+file_handler.setLevel(logging.INFO)
 formatter = logging.Formatter('%(asctime)s %(levelname)s : %(message)s')
 file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
@@ -29,77 +32,81 @@ console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
-def load_data():
-    """
-    Load data from the csv file.
+FIELDNAMES = ['Rollno', 'name', 'english', 'maths', 'science']
+
+UPSERT_SQL = ("INSERT OR REPLACE INTO students(Rollno, name, english, maths, science) "
+              "VALUES(?, ?, ?, ?, ?)")
 
-    :return: List of rows in the csv file as dictionaries.
+_db_lock = threading.Lock()
+_db = sqlite3.connect(db_file, check_same_thread=False)
+_db.row_factory = sqlite3.Row
+_db.execute("PRAGMA journal_mode=WAL")
+# With WAL, NORMAL only fsyncs on checkpoint instead of on every commit;
+# the database stays consistent if the process is killed mid-write.
+_db.execute("PRAGMA synchronous=NORMAL")
+_db.execute("CREATE TABLE IF NOT EXISTS students("
+            "Rollno TEXT PRIMARY KEY, name TEXT, "
+            "english REAL, maths REAL, science REAL)")
+_db.commit()
+
+
+def fast_jsonify(obj, status=200):
     """
-    try:
-        if not os.path.exists(csv_file):
-            with open(csv_file, "w+", newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=['Rollno', 'name', 'english', 'maths', 'science'])
-                writer.writeheader()
-                logging.info("CSV file created as it did not exist.")
-                return []
-        with open(csv_file, 'r') as file:
-            reader = csv.DictReader(file)
-            logging.info(f"Loaded records from CSV.")
-            return list(reader)
-    except Exception as e:
-        logging.error(f"Unexpected error occurred while loading data: {e}")
-        return jsonify({"Unexpected error occurred": e})
+    Serialize a JSON response with orjson instead of Flask's jsonify.
+    :param obj: Object to serialize.
+    :param status: HTTP status code for the response.
+    :return: JSON response.
+    """
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
 
 
-def save(data):
+def import_legacy_csv():
     """
-    Save data to the CSV file.
-    :param data: List of dictionaries representing the rows to be saved.
+    One-time import of records from the legacy csv file into SQLite.
+    The csv file is renamed aside afterwards so later restarts do not
+    re-import records the user has since deleted.
     """
-    with open(csv_file, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=['Rollno', 'name', 'english', 'maths', 'science'])
-        writer.writeheader()
-        writer.writerows(data)
-        logging.info(f"Saved records to CSV.")
+    if not os.path.exists(csv_file):
+        return
+    with _db_lock:
+        with open(csv_file, 'r') as file:
+            _db.executemany(UPSERT_SQL, ([row[field] for field in FIELDNAMES]
+                                         for row in csv.DictReader(file)))
+        _db.commit()
+        os.replace(csv_file, csv_file + '.imported')
+        logger.info("Imported legacy records from CSV into SQLite.")
+
+
+import_legacy_csv()
+
+_AVG_CACHE = {"key": None, "body": None}
 
-def queue_data():
+
+def _data_version():
     """
-    Queue data from the CSV file for processing.
-    :return: Queue containing rows from the CSV file.
+    Version key for the current database contents. total_changes covers
+    writes made through this connection, PRAGMA data_version covers writes
+    made by any other connection.
+    :return: Tuple identifying the current state of the data.
     """
-    q = queue.Queue(maxsize=queue_size)
-    with open(csv_file, 'r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            q.put(row)
-    logging.info("Data queued for processing.")
-    return q
+    row = _db.execute("PRAGMA data_version").fetchone()
+    return (row[0], _db.total_changes)
+
+
+_page_cache = {}
 
 
-def cal_avg(q, result_dict, result_lock):
+def render_static(template):
     """
-    Calculate the average of the subjects of each student from the records in the queue.
-    :param q: Queue containing student records.
-    :param result_dict: Dictionary to store the average results.
-    :param result_lock: Lock to ensure thread safety when updating result_dict.
+    Render a template once per process and serve the cached HTML after that.
+    The form pages never change at runtime, so re-rendering them with Jinja
+    on every GET is wasted work.
+    :param template: Name of the template file.
+    :return: Rendered HTML string.
     """
-    while not q.empty():
-        record = q.get()
-        rollno = record.get('Rollno')
-        try:
-            english = float(record.get('english'))
-            maths = float(record.get('maths'))
-            science = float(record.get('science'))
-            avg = round(((english + maths + science) / 3), 2)
-            with result_lock:
-                result_dict[rollno] = {
-                    'average': avg
-                }
-            logging.debug(f"Calculated average for Rollno {rollno}: {avg}")
-        except ValueError:
-            logging.warning(f"Skipping record for Rollno {rollno} due to invalid data.")
-            print(f"Skipping record for Rollno {rollno} due to invalid data.")
-        q.task_done()
+    if template not in _page_cache:
+        _page_cache[template] = render_template(template)
+    return _page_cache[template]
 
 
 @app.route("/")
@@ -108,7 +115,7 @@ def home():
     Render the home page.
     :return: Rendered home page template.
     """
-    return render_template('index.html')
+    return render_static('index.html')
 
 
 @app.route("/insert", methods=['GET', 'POST'])
@@ -120,34 +127,32 @@ def insert():
     if request.method == 'POST':
         try:
             data = request.form.to_dict()
-            rows = load_data()
-            rows = [row for row in rows if row['Rollno'] != data['Rollno']]
-            rows.append(data)
-            save(rows)
-            logging.info(f"Inserted/Updated record for Rollno {data['Rollno']}.")
-            return jsonify({'status': 'success'}, {"status code": "200"})
+            with _db_lock:
+                _db.execute(UPSERT_SQL, [data[field] for field in FIELDNAMES])
+                _db.commit()
+            logger.info("Inserted/Updated record for Rollno %s.", data['Rollno'])
+            return fast_jsonify(({'status': 'success'}, {"status code": "200"}))
         except Exception as e:
-            logging.error(f"Unexpected error occurred while inserting/updating record: {e}")
-            return jsonify({'Unexpected error ocurred': str(e)}), 500
-    return render_template('insert.html')
+            logger.error("Unexpected error occurred while inserting/updating record: %s", e)
+            return fast_jsonify({'Unexpected error ocurred': str(e)}, status=500)
+    return render_static('insert.html')
 
 
 @app.route("/remove", methods=['GET', 'POST'])
 def remove():
     """
-    Obtain the Rollno whose record is to be deleted. Redirect to delete endpoint.
-    :return: Render to remove page.
+    Obtain the Rollno whose record is to be deleted. Call the delete view directly.
+    :return: JSON response from the delete operation.
     """
     if request.method == 'POST':
         try:
             rollno = request.form["Rollno"]
-            requests.delete(url_for('delete', id=rollno, _external=True))
-            logging.info(f"Requested removal of record for Rollno {rollno}.")
+            logger.info("Requested removal of record for Rollno %s.", rollno)
+            return delete(rollno)
         except Exception as e:
-            logging.error(f"Unexpected error occurred while requesting removal: {e}")
-            return jsonify({'Unexpected error occurred': str(e)}), 500
-        return redirect(url_for('delete', id=rollno))
-    return render_template('remove.html')
+            logger.error("Unexpected error occurred while requesting removal: %s", e)
+            return fast_jsonify({'Unexpected error occurred': str(e)}, status=500)
+    return render_static('remove.html')
 
 
 @app.route("/remove/<id>", methods=['DELETE', 'GET'])
@@ -157,34 +162,31 @@ def delete(id):
     :param id: Rollno of the record to be deleted.
     :return: JSON response indicating the result of the deletion.
     """
-    rows = load_data()
-    flag =0
-    new_rows = [row for row in rows if row['Rollno'] != id]
-    save(new_rows)
-    flag = [1 for row in rows if row['Rollno'] == id]
-    if flag == 0:
-        logging.warning(f"Record with Rollno {id} not found for deletion.")
-        return jsonify({"status": "Record not found"}, {"status code": "404"})
-    logging.info(f"Deleted record for Rollno {id}.")
-    return jsonify({'status': 'success'}, {"status code": "200"})
+    with _db_lock:
+        cursor = _db.execute("DELETE FROM students WHERE Rollno = ?", (id,))
+        _db.commit()
+    if cursor.rowcount == 0:
+        logger.warning("Record with Rollno %s not found for deletion.", id)
+        return fast_jsonify(({"status": "Record not found"}, {"status code": "404"}))
+    logger.info("Deleted record for Rollno %s.", id)
+    return fast_jsonify(({'status': 'success'}, {"status code": "200"}))
 
 
 @app.route("/update", methods=['POST', 'GET'])
 def update_data():
     """
-    Obtain data that need to be updated. Send a put request.
+    Obtain data that need to be updated. Apply the update directly.
     :return: JSON response from the update operation.
     """
     if request.method == 'POST':
         try:
             data = request.form.to_dict()
-            response = requests.put(url_for('update', _external=True), json=data)
-            logging.info(f"Requested update for Rollno {data['Rollno']}.")
-            return response.json()
+            logger.info("Requested update for Rollno %s.", data['Rollno'])
+            return apply_update(data)
         except Exception as e:
-            logging.error(f"Unexpected error occurred while requesting update: {e}")
-            return jsonify({'Unexpected error occurred': str(e)}, 500)
-    return render_template('update.html')
+            logger.error("Unexpected error occurred while requesting update: %s", e)
+            return fast_jsonify({'Unexpected error occurred': str(e)}, status=500)
+    return render_static('update.html')
 
 
 @app.route("/update", methods=['PUT'])
@@ -193,30 +195,40 @@ def update():
     Update a record with new data.
     :return: JSON response indicating the result of the update operation.
     """
-    data = request.get_json()
-    rows = load_data()
-    for row in rows:
-        if row['Rollno'] == data['Rollno']:
-            row.update(data)
-            save(rows)
-            logging.info(f"Updated record for Rollno {data['Rollno']}.")
-            return jsonify({'status': 'success'}, {"status code": "200"})
-    logging.warning(f"Record with Rollno {data['Rollno']} not found for update.")
-    return jsonify({'status': 'Rollno not found'}, {"status code": "404"})
+    return apply_update(request.get_json())
+
+
+def apply_update(data):
+    """
+    Update a record with new data.
+    :param data: Dictionary with the Rollno and the fields to update.
+    :return: JSON response indicating the result of the update operation.
+    """
+    with _db_lock:
+        row = _db.execute("SELECT * FROM students WHERE Rollno = ?",
+                          (data['Rollno'],)).fetchone()
+        if row is None:
+            logger.warning("Record with Rollno %s not found for update.", data['Rollno'])
+            return fast_jsonify(({'status': 'Rollno not found'}, {"status code": "404"}))
+        record = dict(row)
+        record.update(data)
+        _db.execute(UPSERT_SQL, [record[field] for field in FIELDNAMES])
+        _db.commit()
+    logger.info("Updated record for Rollno %s.", data['Rollno'])
+    return fast_jsonify(({'status': 'success'}, {"status code": "200"}))
 
 
 @app.route("/read", methods=['GET', 'POST'])
 def read_rollno():
     """
-    Obtain the Rollno whose record is to be read. Send a get request.
-    :return: Redirect to read endpoint or render remove page.
+    Obtain the Rollno whose record is to be read. Call the read view directly.
+    :return: JSON representation of the record or render read page.
     """
     if request.method == 'POST':
         rollno = request.form["Rollno"]
-        requests.get(url_for('read', id=rollno, _external=True))
-        logging.info(f"Requested read for Rollno {rollno}.")
-        return redirect(url_for('read', id=rollno))
-    return render_template('read.html')
+        logger.info("Requested read for Rollno %s.", rollno)
+        return read(rollno)
+    return render_static('read.html')
 
 
 @app.route("/read/<id>", methods=['GET'])
@@ -226,33 +238,52 @@ def read(id):
     :param id:  Rollno of the record to be read.
     :return: JSON representation of the record or error message.
     """
-    rows = load_data()
-    for row in rows:
-        if row['Rollno'] == id:
-            logging.info(f"Record for Rollno {id} retrieved.")
-            return row
-    logging.warning(f"Record with Rollno {id} not found.")
-    return jsonify({'error': 'Missing Rollno parameter'}, {'status code': '404'})
+    row = _db.execute("SELECT * FROM students WHERE Rollno = ?", (id,)).fetchone()
+    if row is not None:
+        logger.info("Record for Rollno %s retrieved.", id)
+        return fast_jsonify(dict(row))
+    logger.warning("Record with Rollno %s not found.", id)
+    return fast_jsonify(({'error': 'Missing Rollno parameter'}, {'status code': '404'}))
 
 
 @app.route("/average", methods=['GET'])
 def average():
     """
-    Calculate the average marks for each student.
+    Calculate the average marks for each student. The response body is
+    memoized until the underlying data changes.
     :return: JSON response containing average marks for each student.
     """
-    q = queue_data()
-    result_lock = threading.Lock()
-    result_dict = {}
-    threads = []
-    for _ in range(thread_size):
-        thread = threading.Thread(target=cal_avg, args=(q, result_dict, result_lock))
-        thread.start()
-        threads.append(thread)
-    for thread in threads:
-        thread.join()
-    logging.info("Calculated averages for all students.")
-    return jsonify(result_dict)
+    key = _data_version()
+    if _AVG_CACHE["key"] == key:
+        logger.info("Served averages from cache.")
+        return app.response_class(_AVG_CACHE["body"], mimetype='application/json')
+    rollnos, english, maths, science = [], [], [], []
+    for row in _db.execute("SELECT Rollno, english, maths, science FROM students"):
+        try:
+            marks = (float(row['english']), float(row['maths']), float(row['science']))
+        except (TypeError, ValueError):
+            logger.warning("Skipping record for Rollno %s due to invalid data.", row['Rollno'])
+            continue
+        rollnos.append(row['Rollno'])
+        english.append(marks[0])
+        maths.append(marks[1])
+        science.append(marks[2])
+    if np is not None:
+        # Three contiguous float32 columns; two-decimal averages do not
+        # need float64 precision and half the width halves the bandwidth.
+        averages = np.round((np.asarray(english, dtype=np.float32)
+                             + np.asarray(maths, dtype=np.float32)
+                             + np.asarray(science, dtype=np.float32))
+                            * np.float32(1.0 / 3.0), 2)
+    else:
+        averages = [round((e + m + s) / 3, 2)
+                    for e, m, s in zip(english, maths, science)]
+    body = orjson.dumps({'rollnos': rollnos, 'averages': averages},
+                        option=orjson.OPT_SERIALIZE_NUMPY)
+    _AVG_CACHE["key"] = key
+    _AVG_CACHE["body"] = body
+    logger.info("Calculated averages for all students.")
+    return app.response_class(body, mimetype='application/json')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+"""
+WSGI entry point so the app can run under a production server with real
+worker processes instead of the single-process Flask development server.
+
+Run with:
+    gunicorn -w 4 -k gthread --threads 4 wsgi:application
+"""
+import importlib.util
+import os
+
+_spec = importlib.util.spec_from_file_location(
+    "assignment3", os.path.join(os.path.dirname(os.path.abspath(__file__)), "Assignment 3.py"))
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+application = _module.app